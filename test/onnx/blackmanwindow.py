@@ -0,0 +1,109 @@
+"""Generates the ONNX backend node test vectors for BlackmanWindow (opset 17).
+
+The generated test data is consumed by the ONNX backend test harness to
+validate the torch.onnx export of ``aten::blackman_window``; see
+Note [ONNX Operators that are added/updated in opset 17] in
+torch/onnx/symbolic_opset17.py.
+"""
+
+import functools
+import math
+
+import numpy as np
+
+import onnx
+from onnx.backend.test.case.base import Base
+from onnx.backend.test.case.node import expect
+
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Below this size the NumPy path is cheaper than dispatching into the
+# compiled kernel.
+_NUMBA_MIN_SIZE = 4096
+
+# The Chebyshev recurrence drifts as O(size * eps), so restart it from a
+# fresh cos() every block; blocks are also the unit of parallelism.
+_RECURRENCE_BLOCK = 1024
+
+if HAS_NUMBA:
+
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _blackman_nb(size, denom, out):
+        # Single fused loop with no intermediate arrays. Instead of one
+        # cos() per sample, generate the cosine vector with the recurrence
+        # cos((i+1)k) = 2*cos(k)*cos(ik) - cos((i-1)k) -- two FMAs per
+        # sample and two cos() calls per block.
+        k = 2 * math.pi / denom
+        two_cos_k = 2 * math.cos(k)
+        n_blocks = (size + _RECURRENCE_BLOCK - 1) // _RECURRENCE_BLOCK
+        for b in prange(n_blocks):
+            start = b * _RECURRENCE_BLOCK
+            stop = min(start + _RECURRENCE_BLOCK, size)
+            c_prev = math.cos(k * (start - 1))
+            c_curr = math.cos(k * start)
+            for i in range(start, stop):
+                out[i] = 0.42 - 0.5 * c_curr + 0.08 * (2 * c_curr * c_curr - 1)
+                c_prev, c_curr = c_curr, two_cos_k * c_curr - c_prev
+
+
+@functools.lru_cache(maxsize=None)
+def _blackman(size: int, denom: int) -> np.ndarray:
+    """Computes a Blackman window of ``size`` samples over ``denom`` periods.
+
+    The periodic and symmetric windows differ only in the denominator
+    (``size`` vs ``size - 1``), so batched test regeneration hits the cache
+    for repeated ``(size, denom)`` pairs. The window is computed at fp64 and
+    cast to float32 once at the end. The returned array is read-only;
+    callers must copy before mutating.
+    """
+    # Evaluate at fp64 like the reference implementations and cast once at
+    # the end, so float32 rounding never feeds back into the computation.
+    if HAS_NUMBA and size >= _NUMBA_MIN_SIZE:
+        buf = np.empty(size, dtype=np.float64)
+        _blackman_nb(size, denom, buf)
+    else:
+        n = np.arange(size)
+        # Evaluate a single cosine and recover the second harmonic through
+        # the double-angle identity cos(2x) = 2*cos(x)^2 - 1.
+        c = np.cos(2 * np.pi / denom * n)
+        buf = 0.42 - 0.5 * c + 0.08 * (2 * c * c - 1)
+    y = buf.astype(np.float32)
+    y.setflags(write=False)
+    return y
+
+
+class BlackmanWindow(Base):
+    @staticmethod
+    def export() -> None:
+        size = np.int32(10)
+
+        # Test periodic window
+        node = onnx.helper.make_node(
+            "BlackmanWindow",
+            inputs=["x"],
+            outputs=["y"],
+        )
+        y = _blackman(int(size), int(size))
+        expect(
+            node,
+            inputs=[size],
+            outputs=[y.astype(np.float32)],
+            name="test_blackmanwindow",
+        )
+
+        # Test symmetric window
+        node = onnx.helper.make_node(
+            "BlackmanWindow", inputs=["x"], outputs=["y"], periodic=0
+        )
+        y = _blackman(int(size), int(size) - 1)
+        expect(
+            node,
+            inputs=[size],
+            outputs=[y.astype(np.float32)],
+            name="test_blackmanwindow_symmetric",
+        )
@@ -0,0 +1,340 @@
+"""Opt-in telemetry for AWS Deep Learning Container / AMI builds.
+
+Standalone script invoked once at container startup; it records the image
+framework/version against the instance so AWS can measure DLC/DLAMI usage.
+It is not imported by torch and does nothing outside the AWS images that
+ship it. Set ``OPT_OUT_TRACKING=true`` in the image to disable it.
+"""
+
+import argparse
+import concurrent.futures
+import functools
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+
+TIMEOUT_SECS = 5
+
+# Shared pool for the remaining telemetry HTTP (the S3 bucket GET);
+# created on first use so importing this module stays cheap.
+_HTTP = None
+
+# The hand-rolled 0.1s timeout was too tight for token-required hosts.
+_IMDS_TIMEOUT_SECS = 0.5
+
+_VALID_REGIONS = frozenset(
+    {
+        "ap-northeast-1",
+        "ap-northeast-2",
+        "ap-southeast-1",
+        "ap-southeast-2",
+        "ap-south-1",
+        "ca-central-1",
+        "eu-central-1",
+        "eu-north-1",
+        "eu-west-1",
+        "eu-west-2",
+        "eu-west-3",
+        "sa-east-1",
+        "us-east-1",
+        "us-east-2",
+        "us-west-1",
+        "us-west-2",
+    }
+)
+
+_CUDA_RE = re.compile(r"\d+\.\d+")
+_OS_ID_RE = re.compile(r'^ID="?(\w+)"?', re.M)
+_OS_VER_RE = re.compile(r'^VERSION_ID="?([\d.]+)"?', re.M)
+
+# The script is executed from inside the installed torch tree; keep any
+# torch entries at the tail of sys.path so stdlib/site-packages imports
+# resolve first. Two linear scans, preserving relative order.
+sys.path = [p for p in sys.path if "torch" not in p] + [
+    p for p in sys.path if "torch" in p
+]
+
+
+def _get_http():
+    """
+    Create the shared urllib3 pool on first use
+    """
+    # urllib3 is all the S3 probe needs -- no cookies, redirects or auth
+    # machinery -- and it is deferred (like botocore below) so interpreter
+    # startup does not pay for it before the workers run.
+    global _HTTP
+    if _HTTP is None:
+        import urllib3
+
+        _HTTP = urllib3.PoolManager(num_pools=1, maxsize=2, retries=False)
+    return _HTTP
+
+
+def _http_get(url, headers=None, timeout=0.1):
+    """
+    GET helper that swallows connection errors; returns None on failure
+    """
+    import urllib3
+
+    response = None
+    try:
+        response = _get_http().request(
+            "GET",
+            url,
+            headers=headers,
+            timeout=urllib3.Timeout(connect=timeout, read=timeout),
+        )
+    except urllib3.exceptions.HTTPError as e:
+        logging.error(f"Request exception: {e}")
+
+    return response
+
+
+def _validate_instance_id(instance_id):
+    """
+    Validate the instance ID format (i- followed by 17 characters)
+    """
+    # Plain string checks; a few C-level ops beat a regex-engine call.
+    candidate = instance_id[:19]
+    if (
+        len(candidate) == 19
+        and candidate.startswith("i-")
+        and not any(c.isspace() for c in candidate[2:])
+    ):
+        return candidate
+
+    return None
+
+
+def _retrieve_instance_id():
+    """
+    Retrieve the instance ID through botocore's IMDS fetcher
+    """
+    # IMDSFetcher handles IMDSv2 token acquisition, caching and retries,
+    # replacing the hand-rolled token dance.
+    instance_id = None
+    try:
+        from botocore.utils import IMDSFetcher
+
+        fetcher = IMDSFetcher(timeout=_IMDS_TIMEOUT_SECS, num_attempts=1)
+        token = fetcher._fetch_metadata_token()
+        response = fetcher._get_request("/latest/meta-data/instance-id", None, token)
+        instance_id = _validate_instance_id(response.text)
+    except Exception as e:
+        logging.error(f"Failed to retrieve instance id: {e}")
+
+    return instance_id
+
+
+def _retrieve_instance_region():
+    """
+    Retrieve the instance region through botocore's IMDS fetcher
+    """
+    region = None
+    try:
+        from botocore.utils import InstanceMetadataRegionFetcher
+
+        fetched = InstanceMetadataRegionFetcher(
+            timeout=_IMDS_TIMEOUT_SECS, num_attempts=1
+        ).retrieve_region()
+        if fetched in _VALID_REGIONS:
+            region = fetched
+    except Exception as e:
+        logging.error(f"Failed to retrieve instance region: {e}")
+
+    return region
+
+
+@functools.lru_cache(maxsize=1)
+def _retrieve_device():
+    """
+    Retrieve the device type the container is running on
+    """
+    # Single-stat probes first; the PATH scan for nvidia-smi is the most
+    # expensive check, so it runs only when this is not an EIA/Neuron host.
+    device = "cpu"
+    if os.path.isdir("/opt/ei_tools"):
+        device = "eia"
+    elif os.path.exists("/usr/local/bin/tensorflow_model_server_neuron"):
+        device = "neuron"
+    elif shutil.which("nvidia-smi") or os.path.exists("/dev/nvidia0"):
+        device = "gpu"
+    return device
+
+
+@functools.lru_cache(maxsize=1)
+def _retrieve_cuda():
+    """
+    Retrieve the CUDA version from the /usr/local/cuda symlink
+    """
+    cuda_version = ""
+    try:
+        cuda_path = os.path.basename(os.readlink("/usr/local/cuda"))
+        cuda_version_search = _CUDA_RE.search(cuda_path)
+        cuda_version = "" if not cuda_version_search else cuda_version_search.group()
+    except Exception as e:
+        logging.error(f"Failed to get cuda path: {e}")
+    return cuda_version
+
+
+@functools.lru_cache(maxsize=1)
+def _retrieve_os():
+    """
+    Retrieve the OS name and version from /etc/os-release
+    """
+    # Slurp the file and pull the fields out with two independent searches
+    # (field order varies between distributions, and either field may be
+    # absent or unquoted); concatenate whatever matched.
+    with open("/etc/os-release") as os_file:
+        contents = os_file.read()
+    id_match = _OS_ID_RE.search(contents)
+    ver_match = _OS_VER_RE.search(contents)
+    name = id_match.group(1) if id_match else ""
+    version = ver_match.group(1) if ver_match else ""
+    return name + version
+
+
+def parse_args():
+    """
+    Parse the telemetry arguments baked into the image entrypoint
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--framework",
+        choices=["tensorflow", "mxnet", "pytorch"],
+        help="framework of the container image.",
+        required=True,
+    )
+    parser.add_argument(
+        "--framework-version",
+        help="framework version of the container image.",
+        required=True,
+    )
+    parser.add_argument(
+        "--container-type",
+        choices=["training", "inference"],
+        help="kind of jobs the container runs, either training or inference.",
+        required=True,
+    )
+    args, _unknown = parser.parse_known_args()
+
+    fw_version_pattern = r"\d+(\.\d+){1,2}(-rc\d)?"
+    if not re.fullmatch(fw_version_pattern, args.framework_version):
+        raise ValueError(
+            f"args.framework_version = {args.framework_version} does not match "
+            f"{fw_version_pattern}. Please specify the framework version as X.Y.Z or X.Y."
+        )
+
+    return args
+
+
+def query_bucket(args, instance_id, region):
+    """
+    GET an empty object from the telemetry S3 bucket to record the image use
+    """
+    response = None
+    py_version = sys.version.split(" ")[0]
+
+    if instance_id is not None and region is not None:
+        url = (
+            "https://aws-deep-learning-containers-{0}.s3.{0}.amazonaws.com"
+            "/dlc-containers-{1}.txt?x-instance-id={1}&x-framework={2}"
+            "&x-framework_version={3}&x-py_version={4}&x-container_type={5}".format(
+                region,
+                instance_id,
+                args.framework,
+                args.framework_version,
+                py_version,
+                args.container_type,
+            )
+        )
+        response = _http_get(url, timeout=0.2)
+        if os.environ.get("TEST_MODE") == str(1):
+            with open(os.path.join(os.sep, "tmp", "test_request.txt"), "w+") as rf:
+                rf.write(url)
+
+    logging.debug(f"Query bucket finished: {response}")
+
+    return response
+
+
+def tag_instance(args, instance_id, region):
+    """
+    Tag the instance running the container using botocore
+    """
+    py_version = sys.version.split(" ")[0]
+    device = _retrieve_device()
+    cuda_version = f"_cuda{_retrieve_cuda()}" if device == "gpu" else ""
+    os_version = _retrieve_os()
+
+    tag = (
+        f"{args.framework}_{args.container_type}_{args.framework_version}"
+        f"_python{py_version}_{device}{cuda_version}_{os_version}"
+    )
+    tag_struct = {"Key": "aws-dlc-autogenerated-tag-do-not-delete", "Value": tag}
+
+    request_status = None
+    if instance_id and region:
+        try:
+            import botocore.config
+            import botocore.session
+
+            session = botocore.session.get_session()
+            # Bound the EC2 call explicitly: botocore's 60s default
+            # connect/read timeouts plus retries would outlive main's
+            # TIMEOUT_SECS wait, and executor threads are non-daemon, so a
+            # stalled create_tags would block interpreter exit for minutes.
+            ec2_client = session.create_client(
+                "ec2",
+                region_name=region,
+                config=botocore.config.Config(
+                    connect_timeout=2, read_timeout=2, retries={"max_attempts": 0}
+                ),
+            )
+            response = ec2_client.create_tags(Resources=[instance_id], Tags=[tag_struct])
+            request_status = response.get("ResponseMetadata").get("HTTPStatusCode")
+            if os.environ.get("TEST_MODE") == str(1):
+                with open(os.path.join(os.sep, "tmp", "test_tag_request.txt"), "w+") as rf:
+                    rf.write(json.dumps(tag_struct, indent=4))
+        except Exception as e:
+            logging.error(f"Error. {e}")
+        logging.debug(f"Instance tagged: {request_status}")
+    else:
+        logging.error("Failed to retrieve instance id or region")
+
+    return request_status
+
+
+def main():
+    """
+    Invoke the bucket query and the instance tagging in parallel
+    """
+    # Logs are not necessary for a normal run. Remove this line while debugging.
+    logging.getLogger().disabled = True
+
+    logging.basicConfig(level=logging.ERROR)
+    # Parse the arguments and resolve the instance metadata once; both
+    # workers need them and each IMDS lookup is an HTTP round-trip.
+    args = parse_args()
+    instance_id = _retrieve_instance_id()
+    region = _retrieve_instance_region()
+    worker_args = (args, instance_id, region)
+
+    # Both workers are pure network I/O, so threads are enough; forking a
+    # second interpreter only re-pays the botocore/requests import cost.
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    futures = [
+        executor.submit(query_bucket, *worker_args),
+        executor.submit(tag_instance, *worker_args),
+    ]
+    concurrent.futures.wait(futures, timeout=TIMEOUT_SECS)
+    # cancel_futures would be a no-op here: with two workers for two
+    # futures, both are already running by the time the wait returns.
+    executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()